@@ -1,11 +1,8 @@
 import pandas as pd
 import numpy as np
 import logging
-from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import seaborn as sns
-from wordcloud import WordCloud
 from config import Config
 
 class JobMarketAnalyzer:
@@ -13,12 +10,20 @@ class JobMarketAnalyzer:
         self.logger = logging.getLogger(__name__)
         self.data = data
         self.analysis_results = {}
+        self._clear_cache()
     
     def load_data(self, df):
         """Load data for analysis"""
         self.data = df
+        self._clear_cache()
         self.logger.info(f"Loaded {len(df) if df is not None else 0} records for analysis")
     
+    def _clear_cache(self):
+        """Drop intermediate results shared between analyses"""
+        self._skills_flat = None
+        self._location_stats_cache = None
+        self._company_stats_cache = None
+    
     def analyze_skills_demand(self):
         """Analyze skills demand across job postings"""
         if self.data is None or self.data.empty:
@@ -26,85 +31,65 @@ class JobMarketAnalyzer:
         
         self.logger.info("Analyzing skills demand")
         
-        # Flatten all skills
-        all_skills = []
-        for skills_list in self.data['skills_list'].dropna():
-            if skills_list:
-                all_skills.extend([skill.lower().strip() for skill in skills_list])
+        skills_counts = self._flat_skills()['skill'].value_counts()
         
-        if not all_skills:
+        if skills_counts.empty:
             return {}
         
-        skills_counter = Counter(all_skills)
-        
         analysis = {
-            'top_skills': dict(skills_counter.most_common(20)),
-            'total_unique_skills': len(skills_counter),
+            'top_skills': skills_counts.head(20).to_dict(),
+            'total_unique_skills': len(skills_counts),
             'skills_by_experience': self._analyze_skills_by_experience(),
             'skills_by_location': self._analyze_skills_by_location(),
-            'emerging_skills': self._identify_emerging_skills()
+            'emerging_skills': self._identify_emerging_skills(skills_counts)
         }
         
         self.analysis_results['skills_demand'] = analysis
         return analysis
     
+    def _flat_skills(self):
+        """Flatten skills lists into one normalized skill per row, joined with the job's grouping columns"""
+        if self._skills_flat is None:
+            skills = self.data['skills_list'].explode().dropna()
+            skills = skills.str.lower().str.strip()
+            self._skills_flat = skills.to_frame('skill').join(
+                self.data[['experience_level', 'location_cleaned', 'company_cleaned']], how='left'
+            )
+        return self._skills_flat
+    
+    def _top_skills_by(self, column, groups, top_n):
+        """Get the top_n skills for each group of a column in a single pass"""
+        skills = self._flat_skills()
+        skills = skills[skills[column].isin(groups)]
+        top_skills = (
+            skills.groupby([column, 'skill'], observed=True, sort=False).size()
+            .sort_values(ascending=False, kind='stable')
+            .groupby(level=0, observed=True, sort=False).head(top_n)
+        )
+        
+        skills_by_group = {}
+        for (group, skill), count in top_skills.to_dict().items():
+            skills_by_group.setdefault(group, {})[skill] = count
+        
+        return {group: skills_by_group[group] for group in groups if group in skills_by_group}
+    
     def _analyze_skills_by_experience(self):
         """Analyze skills demand by experience level"""
-        skills_by_exp = {}
-        
-        for exp_level in self.data['experience_level'].unique():
-            if pd.isna(exp_level):
-                continue
-                
-            level_data = self.data[self.data['experience_level'] == exp_level]
-            level_skills = []
-            
-            for skills_list in level_data['skills_list'].dropna():
-                if skills_list:
-                    level_skills.extend([skill.lower().strip() for skill in skills_list])
-            
-            if level_skills:
-                skills_by_exp[exp_level] = dict(Counter(level_skills).most_common(10))
-        
-        return skills_by_exp
+        exp_levels = self.data['experience_level'].dropna().unique()
+        return self._top_skills_by('experience_level', exp_levels, 10)
     
     def _analyze_skills_by_location(self):
         """Analyze skills demand by location"""
-        skills_by_location = {}
-        
-        top_locations = self.data['location_cleaned'].value_counts().head(5).index
-        
-        for location in top_locations:
-            if pd.isna(location):
-                continue
-                
-            location_data = self.data[self.data['location_cleaned'] == location]
-            location_skills = []
-            
-            for skills_list in location_data['skills_list'].dropna():
-                if skills_list:
-                    location_skills.extend([skill.lower().strip() for skill in skills_list])
-            
-            if location_skills:
-                skills_by_location[location] = dict(Counter(location_skills).most_common(10))
-        
-        return skills_by_location
+        top_locations = self._location_stats().head(5).index
+        return self._top_skills_by('location_cleaned', top_locations, 10)
     
-    def _identify_emerging_skills(self):
-        """Identify potentially emerging skills"""
+    def _identify_emerging_skills(self, skills_counts):
+        """Identify potentially emerging skills from overall skill counts"""
         # This is a simplified approach - in reality, you'd need historical data
-        all_skills = []
-        for skills_list in self.data['skills_list'].dropna():
-            if skills_list:
-                all_skills.extend([skill.lower().strip() for skill in skills_list])
-        
-        skills_counter = Counter(all_skills)
-        
         # Consider skills with moderate frequency as potentially emerging
-        emerging = {skill: count for skill, count in skills_counter.items() 
-                   if 5 <= count <= 20}
+        emerging = skills_counts[(skills_counts >= 5) & (skills_counts <= 20)]
         
-        return dict(sorted(emerging.items(), key=lambda x: x[1], reverse=True))
+        return emerging.to_dict()
     
     def analyze_geographic_distribution(self):
         """Analyze geographic distribution of jobs"""
@@ -113,16 +98,37 @@ class JobMarketAnalyzer:
         
         self.logger.info("Analyzing geographic distribution")
         
+        location_stats = self._location_stats()
+        
         location_analysis = {
-            'jobs_by_location': self.data['location_cleaned'].value_counts().to_dict(),
-            'location_percentage': (self.data['location_cleaned'].value_counts() / len(self.data) * 100).to_dict(),
-            'avg_experience_by_location': self.data.groupby('location_cleaned')['experience_min'].mean().to_dict(),
-            'companies_by_location': self.data.groupby('location_cleaned')['company_cleaned'].nunique().to_dict()
+            'jobs_by_location': location_stats['jobs'].to_dict(),
+            'location_percentage': (location_stats['jobs'] / len(self.data) * 100).to_dict(),
+            'avg_experience_by_location': location_stats['avg_experience'].to_dict(),
+            'companies_by_location': location_stats['companies'].to_dict()
         }
         
         self.analysis_results['geographic_distribution'] = location_analysis
         return location_analysis
     
+    def _location_stats(self):
+        """Aggregate per-location job counts, average experience and company counts in one pass"""
+        if self._location_stats_cache is None:
+            self._location_stats_cache = self.data.groupby('location_cleaned', observed=True).agg(
+                jobs=('experience_min', 'size'),
+                avg_experience=('experience_min', 'mean'),
+                companies=('company_cleaned', 'nunique')
+            ).sort_values('jobs', ascending=False, kind='stable')
+        return self._location_stats_cache
+    
+    def _company_stats(self):
+        """Aggregate per-company job counts and average experience in one pass, most active first"""
+        if self._company_stats_cache is None:
+            self._company_stats_cache = self.data.groupby('company_cleaned', observed=True).agg(
+                jobs=('experience_min', 'size'),
+                avg_experience=('experience_min', 'mean')
+            ).sort_values('jobs', ascending=False, kind='stable')
+        return self._company_stats_cache
+    
     def analyze_experience_trends(self):
         """Analyze experience level trends"""
         if self.data is None or self.data.empty:
@@ -130,12 +136,16 @@ class JobMarketAnalyzer:
         
         self.logger.info("Analyzing experience trends")
         
+        level_counts = self.data['experience_level'].value_counts()
+        levels_by_location = self.data.groupby('location_cleaned', observed=True)['experience_level'].value_counts()
+        avg_experience = self.data[['experience_min', 'experience_max']].mean()
+        
         experience_analysis = {
-            'distribution': self.data['experience_level'].value_counts().to_dict(),
-            'percentage': (self.data['experience_level'].value_counts() / len(self.data) * 100).to_dict(),
-            'avg_min_experience': self.data['experience_min'].mean(),
-            'avg_max_experience': self.data['experience_max'].mean(),
-            'experience_by_location': self.data.groupby('location_cleaned')['experience_level'].value_counts().to_dict(),
+            'distribution': level_counts.to_dict(),
+            'percentage': (level_counts / len(self.data) * 100).to_dict(),
+            'avg_min_experience': avg_experience['experience_min'],
+            'avg_max_experience': avg_experience['experience_max'],
+            'experience_by_location': levels_by_location[levels_by_location > 0].to_dict(),
             'experience_by_company_size': self._analyze_experience_by_company_size()
         }
         
@@ -144,19 +154,20 @@ class JobMarketAnalyzer:
     
     def _analyze_experience_by_company_size(self):
         """Analyze experience requirements by company size (based on job postings count)"""
-        company_job_counts = self.data['company_cleaned'].value_counts()
+        company_job_counts = self._company_stats()['jobs']
         
         # Categorize companies by number of job postings as proxy for size
-        large_companies = company_job_counts[company_job_counts >= 10].index
-        medium_companies = company_job_counts[(company_job_counts >= 5) & (company_job_counts < 10)].index
-        small_companies = company_job_counts[company_job_counts < 5].index
+        company_sizes = pd.cut(company_job_counts, bins=[0, 4, 9, np.inf], labels=['Small', 'Medium', 'Large'])
+        job_company_sizes = self.data['company_cleaned'].map(company_sizes.astype(str).to_dict())
+        
+        size_levels = self.data.groupby([job_company_sizes, 'experience_level'], observed=True).size()
+        found_sizes = set(size_levels.index.get_level_values(0))
         
         analysis = {}
         
-        for category, companies in [('Large', large_companies), ('Medium', medium_companies), ('Small', small_companies)]:
-            if len(companies) > 0:
-                category_data = self.data[self.data['company_cleaned'].isin(companies)]
-                analysis[category] = category_data['experience_level'].value_counts().to_dict()
+        for category in ['Large', 'Medium', 'Small']:
+            if category in found_sizes:
+                analysis[category] = size_levels[category].sort_values(ascending=False, kind='stable').to_dict()
         
         return analysis
     
@@ -167,33 +178,23 @@ class JobMarketAnalyzer:
         
         self.logger.info("Analyzing company trends")
         
+        company_stats = self._company_stats()
+        company_job_counts = company_stats['jobs']
+        avg_experience = company_stats['avg_experience'].sort_values(ascending=False)
+        
         company_analysis = {
-            'top_hiring_companies': self.data['company_cleaned'].value_counts().head(20).to_dict(),
-            'companies_by_location': self.data.groupby('location_cleaned')['company_cleaned'].nunique().to_dict(),
-            'avg_experience_by_company': self.data.groupby('company_cleaned')['experience_min'].mean().sort_values(ascending=False).head(10).to_dict(),
-            'company_skill_preferences': self._analyze_company_skill_preferences()
+            'top_hiring_companies': company_job_counts.head(20).to_dict(),
+            'companies_by_location': self._location_stats()['companies'].to_dict(),
+            'avg_experience_by_company': avg_experience.head(10).to_dict(),
+            'company_skill_preferences': self._analyze_company_skill_preferences(company_job_counts.head(10).index)
         }
         
         self.analysis_results['company_trends'] = company_analysis
         return company_analysis
     
-    def _analyze_company_skill_preferences(self):
+    def _analyze_company_skill_preferences(self, top_companies):
         """Analyze skill preferences by top companies"""
-        top_companies = self.data['company_cleaned'].value_counts().head(10).index
-        company_skills = {}
-        
-        for company in top_companies:
-            company_data = self.data[self.data['company_cleaned'] == company]
-            company_skill_list = []
-            
-            for skills_list in company_data['skills_list'].dropna():
-                if skills_list:
-                    company_skill_list.extend([skill.lower().strip() for skill in skills_list])
-            
-            if company_skill_list:
-                company_skills[company] = dict(Counter(company_skill_list).most_common(5))
-        
-        return company_skills
+        return self._top_skills_by('company_cleaned', top_companies, 5)
     
     def analyze_salary_trends(self):
         """Analyze salary trends"""
@@ -212,11 +213,11 @@ class JobMarketAnalyzer:
             'avg_max_salary': salary_data['salary_max'].mean(),
             'median_min_salary': salary_data['salary_min'].median(),
             'median_max_salary': salary_data['salary_max'].median(),
-            'salary_by_experience': salary_data.groupby('experience_level').agg({
+            'salary_by_experience': salary_data.groupby('experience_level', observed=True).agg({
                 'salary_min': ['mean', 'median'],
                 'salary_max': ['mean', 'median']
             }).round(2).to_dict(),
-            'salary_by_location': salary_data.groupby('location_cleaned').agg({
+            'salary_by_location': salary_data.groupby('location_cleaned', observed=True).agg({
                 'salary_min': 'mean',
                 'salary_max': 'mean'
             }).round(2).to_dict(),
@@ -233,8 +234,8 @@ class JobMarketAnalyzer:
         
         self.logger.info("Analyzing job title keywords")
         
-        # Extract keywords from job titles
-        all_titles = ' '.join(self.data['job_title_cleaned'].dropna().astype(str))
+        # Lowercase job titles once for keyword matching
+        titles = self.data['job_title_cleaned'].dropna().str.lower()
         
         # Common data analyst related keywords
         keywords = ['analyst', 'data', 'business', 'senior', 'junior', 'lead', 'principal', 
@@ -242,8 +243,7 @@ class JobMarketAnalyzer:
         
         keyword_analysis = {}
         for keyword in keywords:
-            count = sum(1 for title in self.data['job_title_cleaned'].dropna() 
-                       if keyword.lower() in title.lower())
+            count = int(titles.str.contains(keyword, regex=False).sum())
             if count > 0:
                 keyword_analysis[keyword] = count
         
@@ -269,22 +269,34 @@ class JobMarketAnalyzer:
         
         self.logger.info("Starting complete job market analysis")
         
-        analyses = {
-            'skills_demand': self.analyze_skills_demand(),
-            'geographic_distribution': self.analyze_geographic_distribution(),
-            'experience_trends': self.analyze_experience_trends(),
-            'company_trends': self.analyze_company_trends(),
-            'salary_trends': self.analyze_salary_trends(),
-            'job_title_keywords': self.analyze_job_title_keywords()
+        analysis_methods = {
+            'skills_demand': self.analyze_skills_demand,
+            'geographic_distribution': self.analyze_geographic_distribution,
+            'experience_trends': self.analyze_experience_trends,
+            'company_trends': self.analyze_company_trends,
+            'salary_trends': self.analyze_salary_trends,
+            'job_title_keywords': self.analyze_job_title_keywords
         }
         
+        # Build shared intermediates up front so the worker threads only read them
+        self._flat_skills()
+        self._location_stats()
+        self._company_stats()
+        
+        # The analyses are independent, so run them concurrently; the speedup
+        # comes from the NumPy/Arrow kernels that release the GIL
+        with ThreadPoolExecutor(max_workers=len(analysis_methods)) as executor:
+            futures = {name: executor.submit(method) for name, method in analysis_methods.items()}
+            analyses = {name: future.result() for name, future in futures.items()}
+        
         # Add metadata
+        date_range = self.data['date_scraped'].agg(['min', 'max']) if 'date_scraped' in self.data else None
         analyses['metadata'] = {
             'analysis_date': datetime.now().isoformat(),
             'total_jobs_analyzed': len(self.data),
             'data_date_range': {
-                'from': self.data['date_scraped'].min().isoformat() if 'date_scraped' in self.data else None,
-                'to': self.data['date_scraped'].max().isoformat() if 'date_scraped' in self.data else None
+                'from': date_range['min'].isoformat() if date_range is not None else None,
+                'to': date_range['max'].isoformat() if date_range is not None else None
             }
         }
         
@@ -22,6 +22,7 @@ class Config:
     SEARCH_QUERY = "data analyst"
     MAX_PAGES = 50
     DELAY_BETWEEN_REQUESTS = 2
+    CONCURRENCY = 4  # Max pages loading at once
     MAX_RETRIES = 3
     
     # Headers for requests
@@ -64,6 +65,9 @@ class Config:
         'senior': (8, float('inf'))
     }
     
+    # Visualization settings
+    PLOT_DPI = 120  # Plenty for categorical charts; PNG encode time grows with pixel count
+    
     @classmethod
     def create_directories(cls):
         """Create project directories if they don't exist"""
@@ -1,11 +1,20 @@
 import pandas as pd
 import numpy as np
 import logging
+import os
 from datetime import datetime, timedelta
-import re
-from utils import categorize_experience_level
 from config import Config
 from database import DatabaseManager
+from utils import categorize_experience_level_vec
+
+# Cleaning patterns, kept as strings with inline flags so that pandas can hand
+# them to the Arrow regex kernels instead of falling back to per-row re.sub.
+# Arrow's RE2 engine only treats ASCII characters as \s, so whitespace is spelled
+# out as the characters Python's \s matches (e.g. the \xa0 BeautifulSoup makes of
+# &nbsp;); the literal characters mean the same thing to both engines
+WHITESPACE_CLASS = '[\t\n\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]'
+WHITESPACE_PATTERN = WHITESPACE_CLASS + '+'
+COMPANY_SUFFIX_PATTERN = f'(?i){WHITESPACE_CLASS}*(pvt\\.?|ltd\\.?|limited|inc\\.?|corp\\.?)?{WHITESPACE_CLASS}*$'
 
 class DataProcessor:
     def __init__(self):
@@ -36,17 +45,18 @@ class DataProcessor:
         df = df.drop_duplicates(subset=['job_hash'])
         self.logger.info(f"Removed {original_count - len(df)} duplicate records")
         
+        # Use Arrow-backed strings so the .str operations below run on Arrow kernels
+        for col in ['job_title', 'company', 'location']:
+            df[col] = df[col].astype('string[pyarrow]')
+        
         # Clean job titles
-        df['job_title_cleaned'] = df['job_title'].apply(self._clean_job_title)
+        df['job_title_cleaned'] = self._clean_job_titles(df['job_title'])
         
         # Clean company names
-        df['company_cleaned'] = df['company'].apply(self._clean_company_name)
+        df['company_cleaned'] = self._clean_company_names(df['company'])
         
         # Process experience levels
-        df['experience_level'] = df.apply(
-            lambda row: categorize_experience_level(row['experience_min'], row['experience_max']), 
-            axis=1
-        )
+        df['experience_level'] = categorize_experience_level_vec(df['experience_min'])
         
         # Process locations
         df['location_cleaned'] = df['location'].fillna('Unknown')
@@ -56,52 +66,55 @@ class DataProcessor:
         df['skills_count'] = df['skills_list'].apply(lambda x: len(x) if x else 0)
         
         # Add salary ranges
-        df['salary_range'] = df.apply(self._create_salary_range, axis=1)
+        df['salary_range'] = self._create_salary_ranges(df)
         
         # Add posting age
         df['date_scraped'] = pd.to_datetime(df['date_scraped'])
-        df['days_since_posted'] = (datetime.now() - df['date_scraped']).dt.days
+        df['days_since_posted'] = (pd.Timestamp.now() - df['date_scraped']) // pd.Timedelta(days=1)
         
         # Remove invalid records
         df = df.dropna(subset=['job_title_cleaned', 'company_cleaned'])
         
+        # Store repeated group keys as categoricals for faster groupby/value_counts;
+        # experience_level is categorical already, so drop the levels of removed rows
+        # to keep value_counts from reporting them with a zero count
+        for col in ['location_cleaned', 'company_cleaned', 'experience_level']:
+            df[col] = df[col].astype('category').cat.remove_unused_categories()
+        
+        # Downcast integer columns to the smallest dtype that holds them
+        for col in ['experience_min', 'experience_max', 'skills_count', 'days_since_posted']:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        
         self.logger.info(f"Data cleaning completed. Final dataset: {len(df)} records")
         return df
     
-    def _clean_job_title(self, title):
-        """Clean job title"""
-        if pd.isna(title):
-            return None
-        
-        title = str(title).strip()
-        title = re.sub(r'\s+', ' ', title)  # Remove extra spaces
-        return title
+    def _clean_job_titles(self, titles):
+        """Clean job titles"""
+        # Collapse whitespace runs first so that strip only meets plain spaces
+        return titles.str.replace(WHITESPACE_PATTERN, ' ', regex=True).str.strip()
     
-    def _clean_company_name(self, company):
-        """Clean company name"""
-        if pd.isna(company):
-            return None
-        
-        company = str(company).strip()
-        company = re.sub(r'\s+', ' ', company)
+    def _clean_company_names(self, companies):
+        """Clean company names"""
+        companies = companies.str.replace(WHITESPACE_PATTERN, ' ', regex=True).str.strip()
         # Remove common suffixes
-        company = re.sub(r'\s*(pvt\.?|ltd\.?|limited|inc\.?|corp\.?)?\s*$', '', company, flags=re.IGNORECASE)
-        return company
+        return companies.str.replace(COMPANY_SUFFIX_PATTERN, '', regex=True)
     
-    def _process_skills(self, skills_str):
-        """Process skills string into list"""
-        if pd.isna(skills_str) or not skills_str:
+    def _process_skills(self, skills):
+        """Process list of skills, dropping blank entries"""
+        if not isinstance(skills, list):
             return []
         
-        skills = [skill.strip() for skill in str(skills_str).split(',')]
+        skills = [skill.strip() for skill in skills]
         return [skill for skill in skills if skill]
     
-    def _create_salary_range(self, row):
-        """Create salary range string"""
-        if pd.isna(row['salary_min']) or pd.isna(row['salary_max']):
-            return 'Not Disclosed'
-        
-        return f"₹{row['salary_min']:.1f}-{row['salary_max']:.1f} LPA"
+    def _create_salary_ranges(self, df):
+        """Create salary range strings"""
+        disclosed = df[['salary_min', 'salary_max']].notna().all(axis=1)
+        salary_min = df['salary_min'].map('{:.1f}'.format, na_action='ignore').astype('string')
+        salary_max = df['salary_max'].map('{:.1f}'.format, na_action='ignore').astype('string')
+        
+        salary_ranges = '₹' + salary_min.str.cat(salary_max, sep='-') + ' LPA'
+        return salary_ranges.where(disclosed, 'Not Disclosed')
     
     def generate_summary_stats(self, df):
         """Generate summary statistics"""
@@ -133,28 +146,23 @@ class DataProcessor:
         if df.empty:
             return pd.DataFrame()
         
-        all_skills = []
-        for idx, row in df.iterrows():
-            if row['skills_list']:
-                for skill in row['skills_list']:
-                    all_skills.append({
-                        'job_id': idx,
-                        'skill': skill.lower().strip(),
-                        'company': row['company_cleaned'],
-                        'location': row['location_cleaned'],
-                        'experience_level': row['experience_level']
-                    })
-        
-        if not all_skills:
+        skills = df['skills_list'].explode().dropna()
+        
+        if skills.empty:
             return pd.DataFrame()
         
-        skills_df = pd.DataFrame(all_skills)
+        skills_df = (
+            skills.str.lower().str.strip().rename('skill').to_frame()
+            .join(df[['company_cleaned', 'location_cleaned', 'experience_level']], how='left')
+            .rename(columns={'company_cleaned': 'company', 'location_cleaned': 'location'})
+            .rename_axis('job_id').reset_index()
+        )
         
         # Skills frequency analysis
         skills_analysis = {
             'overall_frequency': skills_df['skill'].value_counts(),
-            'by_experience_level': skills_df.groupby('experience_level')['skill'].value_counts(),
-            'by_location': skills_df.groupby('location')['skill'].value_counts(),
+            'by_experience_level': skills_df.groupby('experience_level', observed=True)['skill'].value_counts(),
+            'by_location': skills_df.groupby('location', observed=True)['skill'].value_counts(),
             'skills_correlation': self._calculate_skills_correlation(skills_df)
         }
         
@@ -162,45 +170,50 @@ class DataProcessor:
     
     def _calculate_skills_correlation(self, skills_df):
         """Calculate which skills appear together frequently"""
-        # Create pivot table for skills correlation
-        job_skills_pivot = skills_df.pivot_table(
-            index='job_id', 
-            columns='skill', 
-            aggfunc='size', 
-            fill_value=0
-        )
-        
-        # Calculate correlation matrix
-        correlation_matrix = job_skills_pivot.corr()
+        job_skills = skills_df[['job_id', 'skill']].drop_duplicates()
+        total_jobs = job_skills['job_id'].nunique()
+        
+        # Work on integer skill codes; sorted uniques keep the codes in alphabetical order
+        skill_codes, skill_names = pd.factorize(job_skills['skill'], sort=True)
+        skill_counts = np.bincount(skill_codes).astype(float)
+        job_skills = pd.DataFrame({'job_id': job_skills['job_id'].to_numpy(), 'skill': skill_codes})
+        
+        # Count co-occurrences only for skill pairs that share a job
+        pairs = job_skills.merge(job_skills, on='job_id', suffixes=('1', '2'))
+        pairs = pairs[pairs['skill1'] < pairs['skill2']]
+        co_counts = pairs.groupby(['skill1', 'skill2']).size()
+        code1 = co_counts.index.get_level_values('skill1').to_numpy()
+        code2 = co_counts.index.get_level_values('skill2').to_numpy()
+        
+        # Phi coefficient, i.e. the correlation of the binary job x skill matrix.
+        # Only pairs with a positive numerator can pass the threshold, so the
+        # denominator is evaluated for those alone (it is never zero for them)
+        count1, count2 = skill_counts[code1], skill_counts[code2]
+        numerator = total_jobs * co_counts.to_numpy(dtype=float) - count1 * count2
+        positive = numerator > 0
+        count1, count2 = count1[positive], count2[positive]
+        correlations = pd.DataFrame({
+            'skill1': skill_names[code1[positive]],
+            'skill2': skill_names[code2[positive]],
+            'correlation': numerator[positive] / np.sqrt(count1 * count2 * (total_jobs - count1) * (total_jobs - count2))
+        })
         
         # Get top correlations
-        correlations = []
-        for i in range(len(correlation_matrix.columns)):
-            for j in range(i+1, len(correlation_matrix.columns)):
-                skill1 = correlation_matrix.columns[i]
-                skill2 = correlation_matrix.columns[j]
-                corr_value = correlation_matrix.iloc[i, j]
-                
-                if corr_value > 0.3:  # Only strong correlations
-                    correlations.append({
-                        'skill1': skill1,
-                        'skill2': skill2,
-                        'correlation': corr_value
-                    })
-        
-        return sorted(correlations, key=lambda x: x['correlation'], reverse=True)
+        correlations = correlations[correlations['correlation'] > 0.3]  # Only strong correlations
+        correlations = correlations.sort_values('correlation', ascending=False, kind='stable')
+        return correlations.to_dict('records')
     
     def save_processed_data(self, df, filename_suffix=""):
-        """Save processed data to CSV"""
+        """Save processed data to Parquet"""
         if df.empty:
             self.logger.warning("No data to save")
             return None
         
         timestamp = Config.get_timestamp()
-        filename = f"processed_jobs_{timestamp}{filename_suffix}.csv"
+        filename = f"processed_jobs_{timestamp}{filename_suffix}.parquet"
         filepath = os.path.join(Config.PROCESSED_DATA_DIR, filename)
         
-        df.to_csv(filepath, index=False)
+        df.to_parquet(filepath, engine='pyarrow', compression='zstd', index=False)
         self.logger.info(f"Processed data saved to {filepath}")
         return filepath
     
@@ -2,151 +2,375 @@ import sqlite3
 import pandas as pd
 from datetime import datetime
 import logging
+import threading
 from config import Config
+from utils import create_job_hash
 
 class DatabaseManager:
     def __init__(self, db_path=None):
         self.db_path = db_path or Config.DATABASE_PATH
         self.logger = logging.getLogger(__name__)
+        # A single connection is shared by all calls; the lock serializes access to it
+        self.conn = self._connect()
+        self._lock = threading.Lock()
         self.init_database()
     
+    def _connect(self):
+        """Open a connection tuned for the scraper's write-heavy workload"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-64000')
+        conn.execute('PRAGMA mmap_size=268435456')
+        return conn
+    
+    def close(self):
+        """Close the shared database connection, checkpointing the WAL"""
+        with self._lock:
+            self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def init_database(self):
         """Initialize database with required tables"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Job postings table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS job_postings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    job_title TEXT NOT NULL,
-                    company TEXT NOT NULL,
-                    location TEXT,
-                    experience_min INTEGER,
-                    experience_max INTEGER,
-                    salary_min REAL,
-                    salary_max REAL,
-                    description TEXT,
-                    date_posted DATE,
-                    date_scraped DATE DEFAULT CURRENT_TIMESTAMP,
-                    url TEXT,
-                    job_hash TEXT UNIQUE,
-                    is_active BOOLEAN DEFAULT 1
-                )
-            ''')
-            
-            # Skills table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS job_skills (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    job_id INTEGER,
-                    skill TEXT NOT NULL,
-                    skill_category TEXT,
-                    FOREIGN KEY (job_id) REFERENCES job_postings(id),
-                    UNIQUE(job_id, skill)
-                )
-            ''')
-            
-            # Scraping log table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS scraping_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    pages_scraped INTEGER,
-                    jobs_found INTEGER,
-                    jobs_inserted INTEGER,
-                    duplicates_found INTEGER,
-                    errors INTEGER,
-                    status TEXT
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
+            with self._lock, self.conn:
+                cursor = self.conn.cursor()
+                
+                # Job postings table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS job_postings (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        job_title TEXT NOT NULL,
+                        company TEXT NOT NULL,
+                        location TEXT,
+                        experience_min INTEGER,
+                        experience_max INTEGER,
+                        salary_min REAL,
+                        salary_max REAL,
+                        description TEXT,
+                        date_posted DATE,
+                        date_scraped DATE DEFAULT CURRENT_TIMESTAMP,
+                        url TEXT,
+                        job_hash TEXT UNIQUE,
+                        is_active BOOLEAN DEFAULT 1
+                    )
+                ''')
+                
+                # Skills table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS job_skills (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        job_id INTEGER,
+                        skill TEXT NOT NULL,
+                        skill_category TEXT,
+                        FOREIGN KEY (job_id) REFERENCES job_postings(id),
+                        UNIQUE(job_id, skill)
+                    )
+                ''')
+                
+                # Scraping log table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS scraping_log (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        pages_scraped INTEGER,
+                        jobs_found INTEGER,
+                        jobs_inserted INTEGER,
+                        duplicates_found INTEGER,
+                        errors INTEGER,
+                        status TEXT
+                    )
+                ''')
+                
+                # Serves the date window used by the analysis queries; job_skills lookups
+                # by job_id are already covered by its UNIQUE(job_id, skill) index
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_jobs_active_scraped
+                    ON job_postings (is_active, date_scraped)
+                ''')
+                
+                self._migrate_job_hashes(cursor)
+                
             self.logger.info("Database initialized successfully")
             
         except Exception as e:
             self.logger.error(f"Database initialization error: {str(e)}")
             raise
     
+    def _migrate_job_hashes(self, cursor):
+        """Rehash rows stored with the old 32-character MD5 job hashes"""
+        cursor.execute(
+            'SELECT id, job_title, company, location FROM job_postings WHERE length(job_hash) = 32'
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        
+        cursor.executemany(
+            'UPDATE OR IGNORE job_postings SET job_hash = ? WHERE id = ?',
+            [(create_job_hash(title, company, location or ''), job_id)
+             for job_id, title, company, location in rows]
+        )
+        self.logger.info(f"Migrated {len(rows)} job hashes")
+    
     def insert_job_posting(self, job_data):
         """Insert a single job posting"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR IGNORE INTO job_postings 
-                (job_title, company, location, experience_min, experience_max,
-                 salary_min, salary_max, description, date_posted, url, job_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job_data['job_title'], job_data['company'], job_data['location'],
-                job_data.get('experience_min'), job_data.get('experience_max'),
-                job_data.get('salary_min'), job_data.get('salary_max'),
-                job_data['description'], job_data.get('date_posted'),
-                job_data.get('url'), job_data['job_hash']
-            ))
-            
-            job_id = cursor.lastrowid
-            
-            # Insert skills if job was inserted
-            if job_id and 'skills' in job_data:
-                for skill in job_data['skills']:
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO job_skills (job_id, skill, skill_category)
-                        VALUES (?, ?, ?)
-                    ''', (job_id, skill['name'], skill.get('category')))
-            
-            conn.commit()
-            conn.close()
-            return job_id
-            
+            with self._lock, self.conn:
+                cursor = self.conn.cursor()
+                
+                cursor.execute('''
+                    INSERT OR IGNORE INTO job_postings 
+                    (job_title, company, location, experience_min, experience_max,
+                     salary_min, salary_max, description, date_posted, url, job_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    job_data['job_title'], job_data['company'], job_data['location'],
+                    job_data.get('experience_min'), job_data.get('experience_max'),
+                    job_data.get('salary_min'), job_data.get('salary_max'),
+                    job_data['description'], job_data.get('date_posted'),
+                    job_data.get('url'), job_data['job_hash']
+                ))
+                
+                # The shared connection keeps lastrowid from earlier inserts,
+                # so use rowcount to tell whether this job was actually inserted
+                job_id = cursor.lastrowid if cursor.rowcount == 1 else None
+                
+                # Insert skills if job was inserted
+                if job_id and 'skills' in job_data:
+                    for skill in job_data['skills']:
+                        cursor.execute('''
+                            INSERT OR IGNORE INTO job_skills (job_id, skill, skill_category)
+                            VALUES (?, ?, ?)
+                        ''', (job_id, skill['name'], skill.get('category')))
+                
+                return job_id
+                
         except Exception as e:
             self.logger.error(f"Error inserting job posting: {str(e)}")
             return None
     
+    def insert_jobs_bulk(self, jobs):
+        """Insert a batch of job postings and their skills in a single transaction"""
+        if not jobs:
+            return 0
+        
+        try:
+            with self._lock, self.conn:
+                cursor = self.conn.cursor()
+                
+                # Skip jobs already stored, and keep the first of any repeated hashes in the batch
+                hashes = list({job['job_hash'] for job in jobs})
+                cursor.execute(
+                    f"SELECT job_hash FROM job_postings WHERE job_hash IN ({','.join('?' * len(hashes))})",
+                    hashes
+                )
+                existing_hashes = {row[0] for row in cursor.fetchall()}
+                
+                new_jobs = {}
+                for job in jobs:
+                    if job['job_hash'] not in existing_hashes:
+                        new_jobs.setdefault(job['job_hash'], job)
+                
+                if not new_jobs:
+                    return 0
+                
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO job_postings 
+                    (job_title, company, location, experience_min, experience_max,
+                     salary_min, salary_max, description, date_posted, url, job_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [(
+                    job['job_title'], job['company'], job['location'],
+                    job.get('experience_min'), job.get('experience_max'),
+                    job.get('salary_min'), job.get('salary_max'),
+                    job['description'], job.get('date_posted'),
+                    job.get('url'), job['job_hash']
+                ) for job in new_jobs.values()])
+                
+                cursor.execute(
+                    f"SELECT job_hash, id FROM job_postings WHERE job_hash IN ({','.join('?' * len(new_jobs))})",
+                    list(new_jobs)
+                )
+                job_ids = dict(cursor.fetchall())
+                
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO job_skills (job_id, skill, skill_category)
+                    VALUES (?, ?, ?)
+                ''', [
+                    (job_ids[job_hash], skill['name'], skill.get('category'))
+                    for job_hash, job in new_jobs.items()
+                    for skill in job.get('skills', [])
+                ])
+                
+                return len(new_jobs)
+                
+        except Exception as e:
+            self.logger.error(f"Error inserting job postings: {str(e)}")
+            return None
+    
+    def get_job_hashes(self):
+        """Return the set of job hashes already stored"""
+        try:
+            with self._lock, self.conn:
+                return {row[0] for row in self.conn.execute('SELECT job_hash FROM job_postings')}
+                
+        except Exception as e:
+            self.logger.error(f"Error retrieving job hashes: {str(e)}")
+            return set()
+    
     def get_job_data(self, days_back=30):
         """Retrieve job data for analysis"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            
-            query = '''
-                SELECT jp.*, GROUP_CONCAT(js.skill) as skills
-                FROM job_postings jp
-                LEFT JOIN job_skills js ON jp.id = js.job_id
-                WHERE jp.date_scraped >= date('now', '-{} days')
-                AND jp.is_active = 1
-                GROUP BY jp.id
-            '''.format(days_back)
-            
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            
-            return df
-            
+            with self._lock, self.conn:
+                date_filter = '''
+                    WHERE date_scraped >= date('now', ?)
+                    AND is_active = 1
+                '''
+                params = (f'-{int(days_back)} days',)
+                
+                df = pd.read_sql_query('SELECT * FROM job_postings' + date_filter, self.conn, params=params)
+                
+                # Fetch skills separately and group them per job here, rather than
+                # having SQLite build a GROUP_CONCAT string that is split again later
+                skills = pd.read_sql_query(
+                    'SELECT job_id, skill FROM job_skills WHERE job_id IN (SELECT id FROM job_postings'
+                    + date_filter + ')',
+                    self.conn,
+                    params=params
+                )
+                df['skills'] = df['id'].map(skills.groupby('job_id')['skill'].agg(list))
+                
+                return self._optimize_dtypes(df)
+                
         except Exception as e:
             self.logger.error(f"Error retrieving job data: {str(e)}")
             return pd.DataFrame()
     
-    def log_scraping_session(self, stats):
-        """Log scraping session statistics"""
+    def get_job_data_iter(self, days_back=30, batch_size=500):
+        """Yield job postings as dicts, batch by batch, without building a DataFrame"""
+        # The iterator reads through its own connection: writes on the shared one
+        # between batches cannot disturb the cursor, and under WAL the iteration
+        # sees one consistent snapshot without holding the lock
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO scraping_log 
-                (pages_scraped, jobs_found, jobs_inserted, duplicates_found, errors, status)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                stats['pages_scraped'], stats['jobs_found'], stats['jobs_inserted'],
-                stats['duplicates_found'], stats['errors'], stats['status']
-            ))
+            cursor = conn.execute('''
+                SELECT * FROM job_postings
+                WHERE date_scraped >= date('now', ?)
+                AND is_active = 1
+            ''', (f'-{int(days_back)} days',))
             
-            conn.commit()
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                
+                skills = {}
+                for job_id, skill in conn.execute(
+                    f"SELECT job_id, skill FROM job_skills WHERE job_id IN ({','.join('?' * len(rows))})",
+                    [row['id'] for row in rows]
+                ):
+                    skills.setdefault(job_id, []).append(skill)
+                
+                for row in rows:
+                    job = dict(row)
+                    job['skills'] = skills.get(job['id'], [])
+                    yield job
+        finally:
             conn.close()
+    
+    @staticmethod
+    def _optimize_dtypes(df):
+        """Shrink the int64 columns and parse the dates returned by read_sql_query"""
+        # Text columns are left as they are: DataProcessor.clean_data decides their dtype
+        for col in ['id', 'experience_min', 'experience_max', 'is_active']:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        
+        for col in ['date_posted', 'date_scraped']:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+        
+        return df
+    
+    def get_summary_stats(self, days_back=30):
+        """Aggregate summary statistics in SQLite without loading job rows"""
+        try:
+            with self._lock, self.conn:
+                cursor = self.conn.cursor()
+                
+                date_filter = '''
+                    FROM job_postings
+                    WHERE date_scraped >= date('now', ?)
+                    AND is_active = 1
+                '''
+                params = (f'-{int(days_back)} days',)
+                
+                cursor.execute('''
+                    SELECT COUNT(*), COUNT(DISTINCT company), COUNT(DISTINCT location),
+                           AVG(experience_min), AVG(experience_max),
+                           COUNT(salary_min) * 100.0 / COUNT(*),
+                           MIN(date_scraped), MAX(date_scraped)
+                ''' + date_filter, params)
+                (total_jobs, unique_companies, unique_locations, avg_exp_min, avg_exp_max,
+                 salary_disclosed, date_from, date_to) = cursor.fetchone()
+                
+                if not total_jobs:
+                    return {}
+                
+                cursor.execute('''
+                    SELECT location, COUNT(*) AS jobs
+                ''' + date_filter + '''
+                    GROUP BY location ORDER BY jobs DESC LIMIT 10
+                ''', params)
+                top_locations = dict(cursor.fetchall())
+                
+                cursor.execute('''
+                    SELECT company, COUNT(*) AS jobs
+                ''' + date_filter + '''
+                    GROUP BY company ORDER BY jobs DESC LIMIT 10
+                ''', params)
+                top_companies = dict(cursor.fetchall())
+                
+                return {
+                    'total_jobs': total_jobs,
+                    'unique_companies': unique_companies,
+                    'unique_locations': unique_locations,
+                    'avg_experience_min': avg_exp_min,
+                    'avg_experience_max': avg_exp_max,
+                    'salary_disclosed_percentage': salary_disclosed,
+                    'top_locations': top_locations,
+                    'top_companies': top_companies,
+                    'date_range': {
+                        'from': date_from[:10],
+                        'to': date_to[:10]
+                    }
+                }
+                
+        except Exception as e:
+            self.logger.error(f"Error retrieving summary stats: {str(e)}")
+            return {}
+    
+    def log_scraping_session(self, stats):
+        """Log scraping session statistics"""
+        try:
+            with self._lock, self.conn:
+                cursor = self.conn.cursor()
+                
+                cursor.execute('''
+                    INSERT INTO scraping_log 
+                    (pages_scraped, jobs_found, jobs_inserted, duplicates_found, errors, status)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (
+                    stats['pages_scraped'], stats['jobs_found'], stats['jobs_inserted'],
+                    stats['duplicates_found'], stats['errors'], stats['status']
+                ))
             
         except Exception as e:
             self.logger.error(f"Error logging scraping session: {str(e)}")
@@ -37,6 +37,7 @@ def main():
     
     logger.info(f"Starting Data Analyst Job Market Analysis - Mode: {args.mode}")
     
+    scraper = processor = None
     try:
         if args.mode in ['scrape', 'full']:
             # Scraping phase
@@ -117,6 +118,11 @@ def main():
     except Exception as e:
         logger.error(f"An error occurred during analysis: {str(e)}", exc_info=True)
         raise
+    finally:
+        # Close the database connections so SQLite checkpoints and removes its WAL files
+        for component in (scraper, processor):
+            if component is not None:
+                component.db.close()
     
     logger.info("Application finished")
 
@@ -1,8 +1,10 @@
-from bs4 import BeautifulSoup
-import time
+from bs4 import BeautifulSoup, SoupStrainer
+import asyncio
 import logging
+import re
+import requests
 from urllib.parse import urljoin
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
 from utils import (
     create_job_hash,
     extract_experience,
@@ -13,6 +15,19 @@ from utils import (
 from config import Config
 from database import DatabaseManager
 
+# Only these parts of a page are built into a parse tree; the rest is skipped
+JOB_TUPLE_STRAINER = SoupStrainer('div', class_='srp-jobtuple-wrapper')
+DESCRIPTION_STRAINER = SoupStrainer(class_=re.compile('dang-inner-html|JDres|description'))
+
+# (tag, class) of the elements read from each job tuple, and the field they hold
+LISTING_FIELDS = {
+    ('a', 'title'): 'title',
+    ('a', 'subTitle'): 'company',
+    ('li', 'location'): 'location',
+    ('li', 'experience'): 'experience',
+    ('li', 'salary'): 'salary',
+}
+
 
 class JobScraper:
     def __init__(self):
@@ -25,20 +40,24 @@ class JobScraper:
             'duplicates_found': 0,
             'errors': 0
         }
+        self.session = requests.Session()
+        self.session.headers.update(Config.HEADERS)
+        # Hashes of jobs already stored or fetched in this run
+        self.seen_hashes = set()
         self.playwright = None
         self.browser = None
-        self.page = None
+        self.context = None
+        self.semaphore = None
 
-    def start_browser(self):
-        """Start the browser and set up page."""
+    async def start_browser(self):
+        """Start the browser and set up the shared context."""
         try:
-            self.playwright = sync_playwright().start()
-            self.browser = self.playwright.chromium.launch(headless=False)  # headless=False for debugging
-            context = self.browser.new_context()
-            self.page = context.new_page()
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=False)  # headless=False for debugging
+            self.context = await self.browser.new_context()
 
             # Set user agent headers
-            self.page.set_extra_http_headers({
+            await self.context.set_extra_http_headers({
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
                               "(KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
                 "Accept-Language": "en-US,en;q=0.9",
@@ -48,25 +67,44 @@ class JobScraper:
             self.logger.info("Browser started.")
         except Exception as e:
             self.logger.error(f"Error starting the browser: {e}")
-            self.stop_browser()
+            await self.stop_browser()
 
-    def stop_browser(self):
+    async def stop_browser(self):
         """Stop the browser."""
         if self.browser:
-            self.browser.close()
+            await self.browser.close()
         if self.playwright:
-            self.playwright.stop()
+            await self.playwright.stop()
+        self.playwright = self.browser = self.context = None
         self.logger.info("Browser stopped.")
 
-    def get_page_content(self, url):
-        """Fetch the content of a page."""
-        try:
-            self.page.goto(url, timeout=60000)  # Wait up to 60 seconds for page to load
-            self.page.wait_for_timeout(5000)  # Wait for 5 seconds for JS-rendered content
-            return self.page.content()
-        except Exception as e:
-            self.logger.error(f"Page access failed for {url}: {e}")
+    async def get_page_content(self, url):
+        """Fetch the content of a page in its own tab."""
+        if self.context is None:
+            self.logger.error(f"Browser not available, cannot load {url}")
             return ""
+        async with self.semaphore:
+            page = await self.context.new_page()
+            try:
+                await page.goto(url, timeout=60000)  # Wait up to 60 seconds for page to load
+                await page.wait_for_timeout(5000)  # Wait for 5 seconds for JS-rendered content
+                return await page.content()
+            except Exception as e:
+                self.logger.error(f"Page access failed for {url}: {e}")
+                return ""
+            finally:
+                await page.close()
+
+    async def get_static_content(self, url):
+        """Fetch the server-rendered HTML of a page without the browser."""
+        async with self.semaphore:
+            try:
+                response = await asyncio.to_thread(self.session.get, url, timeout=30)
+                response.raise_for_status()
+                return response.text
+            except Exception as e:
+                self.logger.debug(f"Static fetch failed for {url}: {e}")
+                return ""
 
     def build_search_url(self, page_num=1):
         """Build URL for each search page."""
@@ -75,12 +113,20 @@ class JobScraper:
             return f"{base_search_url}-{page_num}"
         return base_search_url
 
-    def parse_job_listing(self, job_element):
+    async def parse_job_listing(self, job_element):
         """Parse the job listing data."""
         try:
             job_data = {}
 
-            title_elem = job_element.find('a', class_='title')
+            # Collect the first element of each field in a single walk of the tuple
+            elements = {}
+            for tag in job_element.find_all(['a', 'li']):
+                for css_class in tag.get('class', []):
+                    field = LISTING_FIELDS.get((tag.name, css_class))
+                    if field:
+                        elements.setdefault(field, tag)
+
+            title_elem = elements.get('title')
             if not title_elem:
                 title_elem = job_element.find('a')
             if title_elem:
@@ -89,49 +135,56 @@ class JobScraper:
             else:
                 return None
 
-            company_elem = job_element.find('a', class_='subTitle')
+            company_elem = elements.get('company')
             job_data['company'] = company_elem.get_text(strip=True) if company_elem else "Unknown"
 
-            location_elem = job_element.find('li', class_='location')
+            location_elem = elements.get('location')
             job_data['location'] = normalize_location(location_elem.get_text(strip=True)) if location_elem else "Unknown"
 
-            exp_elem = job_element.find('li', class_='experience')
+            exp_elem = elements.get('experience')
             if exp_elem:
                 exp_text = exp_elem.get_text(strip=True)
                 job_data['experience_min'], job_data['experience_max'] = extract_experience(exp_text)
             else:
                 job_data['experience_min'] = job_data['experience_max'] = None
 
-            salary_elem = job_element.find('li', class_='salary')
+            salary_elem = elements.get('salary')
             if salary_elem:
                 salary_text = salary_elem.get_text(strip=True)
                 job_data['salary_min'], job_data['salary_max'] = extract_salary(salary_text)
             else:
                 job_data['salary_min'] = job_data['salary_max'] = None
 
-            job_data['description'] = self.get_job_description(job_data['url'])
-
-            if job_data['description']:
-                job_data['skills'] = extract_skills(job_data['description'], Config.TECHNICAL_SKILLS)
-
             job_data['job_hash'] = create_job_hash(
                 job_data['job_title'],
                 job_data.get('company', ''),
                 job_data.get('location', '')
             )
 
+            # Known jobs are left to the database insert to count as duplicates,
+            # so skip the costly description page for them
+            if job_data['job_hash'] in self.seen_hashes:
+                job_data['description'] = ""
+                return job_data
+            self.seen_hashes.add(job_data['job_hash'])
+
+            job_data['description'] = await self.get_job_description(job_data['url'])
+
+            if job_data['description']:
+                job_data['skills'] = extract_skills(job_data['description'], Config.TECHNICAL_SKILLS)
+
             return job_data
         except Exception as e:
             self.logger.error(f"Error parsing job listing: {str(e)}")
             return None
 
-    def get_job_description(self, job_url):
+    async def get_job_description(self, job_url):
         """Get the job description from the job URL."""
         if not job_url:
             return ""
         try:
-            html = self.get_page_content(job_url)
-            soup = BeautifulSoup(html, 'html.parser')
+            html = await self.get_page_content(job_url)
+            soup = BeautifulSoup(html, 'html.parser', parse_only=DESCRIPTION_STRAINER)
             desc_selectors = [
                 '.dang-inner-html', '.job-description', '.JDres', '[class*="description"]'
             ]
@@ -144,29 +197,33 @@ class JobScraper:
             self.logger.warning(f"Could not fetch job description from {job_url}: {str(e)}")
             return ""
 
-    def scrape_page(self, page_num):
+    async def scrape_page(self, page_num):
         """Scrape the jobs from a single page."""
         try:
             url = self.build_search_url(page_num)
             self.logger.info(f"Scraping page {page_num}: {url}")
 
-            content = self.get_page_content(url)
-            soup = BeautifulSoup(content, 'html.parser')
+            content = await self.get_static_content(url)
+            soup = BeautifulSoup(content, 'html.parser', parse_only=JOB_TUPLE_STRAINER)
+            job_elements = soup.select('div.srp-jobtuple-wrapper')
+            if not job_elements:
+                # Listings are not in the server-rendered HTML, so render the page in the browser
+                content = await self.get_page_content(url)
+                soup = BeautifulSoup(content, 'html.parser', parse_only=JOB_TUPLE_STRAINER)
+                job_elements = soup.select('div.srp-jobtuple-wrapper')
 
-            with open(f"debug_page_{page_num}.html", "w", encoding="utf-8") as f:
-                f.write(soup.prettify())
+            if self.logger.isEnabledFor(logging.DEBUG):
+                with open(f"debug_page_{page_num}.html", "w", encoding="utf-8") as f:
+                    f.write(content)
 
-            job_elements = soup.select('div.srp-jobtuple-wrapper')
             if not job_elements:
                 self.logger.warning(f"No job listings found on page {page_num}")
                 return []
 
-            jobs = []
-            for job_elem in job_elements:
-                job_data = self.parse_job_listing(job_elem)
-                if job_data:
-                    jobs.append(job_data)
-                    self.stats['jobs_found'] += 1
+            # Job descriptions are fetched concurrently, bounded by the semaphore
+            results = await asyncio.gather(*(self.parse_job_listing(job_elem) for job_elem in job_elements))
+            jobs = [job_data for job_data in results if job_data]
+            self.stats['jobs_found'] += len(jobs)
 
             self.stats['pages_scraped'] += 1
             return jobs
@@ -176,52 +233,63 @@ class JobScraper:
             self.stats['errors'] += 1
             return []
 
-    def save_jobs_to_database(self, jobs):
+    async def save_jobs_to_database(self, jobs):
         """Save the scraped job listings to the database."""
-        for job in jobs:
-            try:
-                job_id = self.db.insert_job_posting(job)
-                if job_id:
-                    self.stats['jobs_inserted'] += 1
-                    self.logger.debug(f"Inserted job: {job['job_title']} at {job.get('company', 'Unknown')}")
-                else:
-                    self.stats['duplicates_found'] += 1
-            except Exception as e:
-                self.logger.error(f"Error saving job to database: {str(e)}")
-                self.stats['errors'] += 1
+        # The insert runs in a worker thread; stats are updated back on the event loop
+        inserted = await asyncio.to_thread(self.db.insert_jobs_bulk, jobs)
+        if inserted is None:
+            self.stats['errors'] += 1
+            return
+
+        self.stats['jobs_inserted'] += inserted
+        self.stats['duplicates_found'] += len(jobs) - inserted
+        self.logger.debug(f"Inserted {inserted} of {len(jobs)} jobs")
 
     def scrape_all_pages(self, max_pages=None):
         """Scrape all pages up to the max_pages."""
+        return asyncio.run(self._scrape_all_pages(max_pages))
+
+    async def _scrape_all_pages(self, max_pages=None):
         max_pages = max_pages or Config.MAX_PAGES
         all_jobs = []
+        pending_save = None
         self.logger.info(f"Starting scrape of up to {max_pages} pages")
 
-        self.start_browser()  # Launch the browser once here
+        self.seen_hashes = self.db.get_job_hashes()
+        # Caps the number of pages loading at once, for both static and browser fetches;
+        # created here, without the browser, so static fetches work even if it fails to launch
+        self.semaphore = asyncio.Semaphore(Config.CONCURRENCY)
+        await self.start_browser()  # Launch the browser once here
 
         try:
             for page_num in range(1, max_pages + 1):
                 try:
-                    jobs = self.scrape_page(page_num)
+                    jobs = await self.scrape_page(page_num)
                     if not jobs:
                         self.logger.info(f"No jobs found on page {page_num}, stopping")
                         break
-                    self.save_jobs_to_database(jobs)
+                    # Write this page while the next one is fetched, keeping one write in flight
+                    if pending_save:
+                        await pending_save
+                    pending_save = asyncio.create_task(self.save_jobs_to_database(jobs))
                     all_jobs.extend(jobs)
-                    time.sleep(Config.DELAY_BETWEEN_REQUESTS)
+                    await asyncio.sleep(Config.DELAY_BETWEEN_REQUESTS)
                     if page_num % 5 == 0:
                         self.logger.info(f"Completed {page_num} pages, found {len(all_jobs)} jobs")
-                except KeyboardInterrupt:
+                except (KeyboardInterrupt, asyncio.CancelledError):
                     self.logger.info("Scraping interrupted by user")
                     break
                 except Exception as e:
                     self.logger.error(f"Unexpected error on page {page_num}: {str(e)}")
                     self.stats['errors'] += 1
                     continue
+            if pending_save:
+                await pending_save
             self.stats['status'] = 'completed' if self.stats['errors'] == 0 else 'completed_with_errors'
             self.db.log_scraping_session(self.stats)
             self.logger.info(f"Scraping completed. Stats: {self.stats}")
         finally:
-            self.stop_browser()  # Close the browser once at the end
+            await self.stop_browser()  # Close the browser once at the end
 
         return all_jobs
 
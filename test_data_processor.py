@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from data_processor import DataProcessor
+
+RAW_TITLES = ['Data\xa0\xa0Analyst', ' Senior Data Analyst　', 'BI\t\nAnalyst']
+RAW_COMPANIES = [' Acme\xa0Pvt\xa0Ltd\xa0', 'Foo Inc.', '　Bar  Corp']
+
+
+@pytest.fixture
+def processor():
+    # The cleaning helpers don't touch the database, so skip opening one
+    return DataProcessor.__new__(DataProcessor)
+
+
+@pytest.mark.parametrize('dtype', ['string[pyarrow]', object])
+def test_clean_job_titles_collapses_unicode_whitespace(processor, dtype):
+    titles = pd.Series(RAW_TITLES, dtype=dtype)
+    assert processor._clean_job_titles(titles).tolist() == [
+        'Data Analyst', 'Senior Data Analyst', 'BI Analyst'
+    ]
+
+
+@pytest.mark.parametrize('dtype', ['string[pyarrow]', object])
+def test_clean_company_names_strips_suffix_after_unicode_whitespace(processor, dtype):
+    companies = pd.Series(RAW_COMPANIES, dtype=dtype)
+    assert processor._clean_company_names(companies).tolist() == ['Acme Pvt', 'Foo', 'Bar']
@@ -1,9 +1,19 @@
 import re
 import hashlib
+import numpy as np
+import pandas as pd
 import logging
 from datetime import datetime
 import time
-from functools import wraps
+from functools import lru_cache, wraps
+
+# Patterns used for every scraped job, compiled once at import
+_EXPERIENCE_RANGE_RE = re.compile(r'(\d+)\s*[-to]\s*(\d+)\s*year')
+_EXPERIENCE_YEARS_RE = re.compile(r'(\d+)\+?\s*year')
+_SALARY_LAKH_RE = re.compile(r'(\d+(?:\.\d+)?)\s*[-to]\s*(\d+(?:\.\d+)?)\s*lakh')
+_SALARY_RUPEE_RE = re.compile(r'₹\s*(\d+(?:,\d+)*)\s*[-to]\s*₹?\s*(\d+(?:,\d+)*)')
+_INDIA_SUFFIX_RE = re.compile(r'\s*,\s*india$')
+_IN_SUFFIX_RE = re.compile(r'\s*,\s*in$')
 
 def setup_logging(log_level=logging.INFO):
     """Setup logging configuration"""
@@ -19,7 +29,8 @@ def setup_logging(log_level=logging.INFO):
 def create_job_hash(job_title, company, location):
     """Create unique hash for job posting to detect duplicates"""
     unique_string = f"{job_title.lower().strip()}{company.lower().strip()}{location.lower().strip()}"
-    return hashlib.md5(unique_string.encode()).hexdigest()
+    # The hash is only a dedupe key, so a short 64-bit digest is enough
+    return hashlib.blake2b(unique_string.encode(), digest_size=8).hexdigest()
 
 def extract_experience(text):
     """Extract experience range from text"""
@@ -29,12 +40,12 @@ def extract_experience(text):
     text = text.lower()
     
     # Pattern for "X-Y years" or "X to Y years"
-    pattern1 = re.search(r'(\d+)\s*[-to]\s*(\d+)\s*year', text)
+    pattern1 = _EXPERIENCE_RANGE_RE.search(text)
     if pattern1:
         return int(pattern1.group(1)), int(pattern1.group(2))
     
     # Pattern for "X+ years" or "X years"
-    pattern2 = re.search(r'(\d+)\+?\s*year', text)
+    pattern2 = _EXPERIENCE_YEARS_RE.search(text)
     if pattern2:
         years = int(pattern2.group(1))
         return years, years + 2 if '+' in text else years
@@ -53,12 +64,12 @@ def extract_salary(text):
     text = text.lower()
     
     # Pattern for salary in lakhs
-    lakh_pattern = re.search(r'(\d+(?:\.\d+)?)\s*[-to]\s*(\d+(?:\.\d+)?)\s*lakh', text)
+    lakh_pattern = _SALARY_LAKH_RE.search(text)
     if lakh_pattern:
         return float(lakh_pattern.group(1)), float(lakh_pattern.group(2))
     
     # Pattern for salary in rupees
-    rupee_pattern = re.search(r'₹\s*(\d+(?:,\d+)*)\s*[-to]\s*₹?\s*(\d+(?:,\d+)*)', text)
+    rupee_pattern = _SALARY_RUPEE_RE.search(text)
     if rupee_pattern:
         min_sal = float(rupee_pattern.group(1).replace(',', '')) / 100000
         max_sal = float(rupee_pattern.group(2).replace(',', '')) / 100000
@@ -66,59 +77,73 @@ def extract_salary(text):
     
     return None, None
 
+@lru_cache(maxsize=None)
+def _compile_skills_pattern(skills):
+    """Compile one regex over a tuple of skills and map each skill to the skills nested in it"""
+    # Longest skills first so multi-word skills win over shorter alternatives at
+    # the same position; the lookahead lets matches overlap like separate searches
+    alternatives = sorted({skill.lower() for skill in skills}, key=len, reverse=True)
+    pattern = re.compile(r'(?=\b(' + '|'.join(re.escape(skill) for skill in alternatives) + r')\b)')
+    
+    # Only one alternative is captured per position, so a skill that is a whole-word
+    # prefix of a longer one ('sql' in 'sql server') is lost where the longer one
+    # matches. Whether it would have matched depends only on the longer skill's text,
+    # so those prefixes are worked out here and added back for each match
+    nested = {
+        skill: {other for other in alternatives
+                if len(other) < len(skill) and re.match(re.escape(other) + r'\b', skill)}
+        for skill in alternatives
+    }
+    return pattern, nested
+
 def extract_skills(text, skill_list):
     """Extract skills from job description"""
     if not text:
         return []
     
-    text = text.lower()
-    found_skills = []
-    
-    for skill in skill_list:
-        skill_lower = skill.lower()
-        # Use word boundaries to avoid partial matches
-        pattern = r'\b' + re.escape(skill_lower) + r'\b'
-        if re.search(pattern, text):
-            found_skills.append({
-                'name': skill,
-                'category': categorize_skill(skill)
-            })
-    
-    return found_skills
+    pattern, nested = _compile_skills_pattern(tuple(skill_list))
+    matched = set()
+    for match in pattern.finditer(text.lower()):
+        matched.add(match.group(1))
+        matched.update(nested[match.group(1)])
+    
+    return [
+        {'name': skill, 'category': categorize_skill(skill)}
+        for skill in skill_list
+        if skill.lower() in matched
+    ]
+
+# Skill categories, in order of precedence
+SKILL_CATEGORIES = [
+    ('Programming Language', ['python', 'r', 'sql', 'vba', 'java', 'scala']),
+    ('Database', ['mysql', 'postgresql', 'mongodb', 'nosql', 'oracle']),
+    ('Visualization', ['tableau', 'power bi', 'powerbi', 'matplotlib', 'seaborn', 'plotly']),
+    ('Cloud Platform', ['aws', 'azure', 'gcp', 'google cloud']),
+    ('ML/AI Tool', ['scikit-learn', 'tensorflow', 'pytorch', 'keras'])
+]
+
+# Built in reverse so that earlier categories take precedence
+_SKILL_CATEGORY = {
+    skill: category
+    for category, skills in reversed(SKILL_CATEGORIES)
+    for skill in skills
+}
 
 def categorize_skill(skill):
     """Categorize skills into different types"""
-    programming_languages = ['python', 'r', 'sql', 'vba', 'java', 'scala']
-    databases = ['mysql', 'postgresql', 'mongodb', 'nosql', 'oracle']
-    visualization = ['tableau', 'power bi', 'powerbi', 'matplotlib', 'seaborn', 'plotly']
-    cloud = ['aws', 'azure', 'gcp', 'google cloud']
-    ml_tools = ['scikit-learn', 'tensorflow', 'pytorch', 'keras']
-    
-    skill_lower = skill.lower()
-    
-    if skill_lower in programming_languages:
-        return 'Programming Language'
-    elif skill_lower in databases:
-        return 'Database'
-    elif skill_lower in visualization:
-        return 'Visualization'
-    elif skill_lower in cloud:
-        return 'Cloud Platform'
-    elif skill_lower in ml_tools:
-        return 'ML/AI Tool'
-    else:
-        return 'Other'
+    return _SKILL_CATEGORY.get(skill.lower(), 'Other')
 
+@lru_cache(maxsize=1024)
 def normalize_location(location):
-    """Normalize location names"""
+    """Normalize location names (the same few locations repeat across most jobs)"""
     if not location:
         return None
     
     location = location.lower().strip()
     
     # Remove common suffixes
-    location = re.sub(r'\s*,\s*india$', '', location)
-    location = re.sub(r'\s*,\s*in$', '', location)
+    location = _INDIA_SUFFIX_RE.sub('', location)
+    location = _IN_SUFFIX_RE.sub('', location)
     
     # Apply city mappings
     from config import Config
@@ -156,3 +181,17 @@ def categorize_experience_level(min_exp, max_exp):
             return level.title()
     
     return 'Senior+'
+
+def categorize_experience_level_vec(min_exp):
+    """Categorize a Series of minimum experience into levels"""
+    from config import Config
+    
+    min_exp = pd.to_numeric(min_exp)
+    
+    conditions = [min_exp.isna()]
+    choices = ['Unknown']
+    for level, (min_range, max_range) in Config.EXPERIENCE_LEVELS.items():
+        conditions.append(min_exp.between(min_range, max_range))
+        choices.append(level.title())
+    
+    return pd.Series(np.select(conditions, choices, default='Senior+'), index=min_exp.index, dtype='category')
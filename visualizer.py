@@ -1,27 +1,97 @@
+import matplotlib
+matplotlib.use('Agg')  # Plots are only written to files, also from worker processes
 import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-from wordcloud import WordCloud
+from PIL import Image
 import os
+from concurrent.futures import ProcessPoolExecutor
 from config import Config
 import logging
 
+# Static plots rendered by generate_all_visualizations: key -> (method, file name)
+STATIC_PLOTS = {
+    'skills': ('plot_top_skills', 'top_skills'),
+    'geographic': ('plot_geographic_distribution', 'geographic_distribution'),
+    'experience': ('plot_experience_distribution', 'experience_distribution'),
+    'companies': ('plot_top_companies', 'top_companies'),
+    'wordcloud': ('create_skills_wordcloud', 'skills_wordcloud'),
+    'salary': ('plot_salary_analysis', 'salary_analysis'),
+}
+
+# Largest top-N selection any plot makes per result dict, precomputed by
+# generate_all_visualizations (the word cloud draws up to 100 skills)
+TOP_ITEM_SELECTIONS = (
+    ('skills_demand', 'top_skills', 100),
+    ('geographic_distribution', 'jobs_by_location', 15),
+    ('company_trends', 'top_hiring_companies', 15),
+)
+
+
 class JobMarketVisualizer:
     def __init__(self, analysis_results=None):
         self.analysis_results = analysis_results or {}
         self.logger = logging.getLogger(__name__)
+        self._top_items_cache = {}
         
-        # Set style
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
+        # Set style; seaborn is imported here rather than at module level since it
+        # only provides the palette, and plotly/wordcloud are imported where used
+        try:
+            plt.style.use('seaborn-v0_8')
+        except OSError:
+            self.logger.warning("Matplotlib style 'seaborn-v0_8' not available, using defaults")
+        try:
+            import seaborn as sns
+            sns.set_palette("husl")
+        except ImportError:
+            self.logger.warning("seaborn not installed, using the default color palette")
         
         # Create output directory
         self.output_dir = os.path.join(Config.REPORTS_DIR, 'visualizations')
         os.makedirs(self.output_dir, exist_ok=True)
+        self._paths = {name: os.path.join(self.output_dir, f'{name}.png') for _, name in STATIC_PLOTS.values()}
+        self._dashboard_path = os.path.join(self.output_dir, 'interactive_dashboard.html')
+    
+    @staticmethod
+    def _topn_np(data, n):
+        """Return the names and counts of the n largest entries of a {name: count} dict, largest first"""
+        keys = np.fromiter(data.keys(), dtype=object, count=len(data))
+        counts = np.fromiter(data.values(), dtype=np.int64, count=len(data))
+        if n < len(counts):
+            # Partial selection is O(len), only the n selected entries get sorted;
+            # sorting the indices first keeps ties in dict order
+            sel = np.sort(np.argpartition(counts, -n)[-n:])
+        else:
+            sel = np.arange(len(counts))
+        sel = sel[np.argsort(-counts[sel], kind='stable')]
+        return keys[sel].tolist(), counts[sel].tolist()
+    
+    def _top_items(self, section, key, n):
+        """Return the names and counts of the n largest entries of a result dict, largest first"""
+        # Cache at least the top 15 so the plots and the dashboard share one selection
+        cached = self._top_items_cache.get((section, key))
+        if cached is None or cached[0] < n:
+            limit = max(n, 15)
+            cached = (limit, *self._topn_np(self.analysis_results[section][key], limit))
+            self._top_items_cache[(section, key)] = cached
+        
+        return cached[1][:n], cached[2][:n]
+    
+    @staticmethod
+    def _to_soa(columns, fields):
+        """Turn column-oriented {field: {key: value}} results into keys and one array per field"""
+        keys = list(columns[fields[0]])
+        return keys, {field: np.array([columns[field][key] for key in keys]) for field in fields}
+    
+    def _save_figure(self, fig, name):
+        """Save a figure as PNG in the output directory and return its path"""
+        filename = self._paths[name]
+        # Render the canvas once and hand the RGBA buffer straight to Pillow, skipping
+        # savefig's print pipeline; zlib level 1 is plenty for flat-colour charts
+        fig.set_dpi(Config.PLOT_DPI)
+        buffer, size = fig.canvas.print_to_buffer()
+        Image.frombuffer('RGBA', size, buffer, 'raw', 'RGBA', 0, 1).save(filename, 'PNG', compress_level=1)
+        return filename
     
     def plot_top_skills(self, top_n=15, save_plot=True):
         """Create bar plot of top skills"""
@@ -29,14 +99,11 @@ class JobMarketVisualizer:
             self.logger.error("Skills demand analysis not found")
             return None
         
-        skills_data = self.analysis_results['skills_demand']['top_skills']
-        
         # Prepare data
-        skills = list(skills_data.keys())[:top_n]
-        counts = list(skills_data.values())[:top_n]
+        skills, counts = self._top_items('skills_demand', 'top_skills', top_n)
         
         # Create plot
-        fig, ax = plt.subplots(figsize=(12, 8))
+        fig, ax = plt.subplots(figsize=(12, 8), constrained_layout=True)
         bars = ax.barh(skills[::-1], counts[::-1], color=plt.cm.viridis(np.linspace(0, 1, len(skills))))
         
         # Customize plot
@@ -45,15 +112,10 @@ class JobMarketVisualizer:
         ax.set_title(f'Top {top_n} Most Demanded Skills for Data Analysts', fontsize=14, fontweight='bold', pad=20)
         
         # Add value labels on bars
-        for bar, count in zip(bars, counts[::-1]):
-            ax.text(bar.get_width() + 1, bar.get_y() + bar.get_height()/2, 
-                   str(count), va='center', ha='left', fontweight='bold')
-        
-        plt.tight_layout()
+        ax.bar_label(bars, padding=3, fontweight='bold')
         
         if save_plot:
-            filename = os.path.join(self.output_dir, 'top_skills.png')
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
+            filename = self._save_figure(fig, 'top_skills')
             self.logger.info(f"Skills plot saved to {filename}")
         
         return fig
@@ -64,38 +126,34 @@ class JobMarketVisualizer:
             self.logger.error("Geographic distribution analysis not found")
             return None
         
-        location_data = self.analysis_results['geographic_distribution']['jobs_by_location']
-        
         # Prepare data (top 10 locations)
-        top_locations = dict(sorted(location_data.items(), key=lambda x: x[1], reverse=True)[:10])
+        locations, counts = self._top_items('geographic_distribution', 'jobs_by_location', 10)
+        counts = np.array(counts)
         
         # Create subplot with pie chart and bar chart
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8), constrained_layout=True)
         
         # Pie chart
-        colors = plt.cm.Set3(np.linspace(0, 1, len(top_locations)))
-        wedges, texts, autotexts = ax1.pie(top_locations.values(), labels=top_locations.keys(), 
-                                          autopct='%1.1f%%', colors=colors, startangle=90)
+        colors = plt.cm.Set3(np.linspace(0, 1, len(locations)))
+        wedges, _ = ax1.pie(counts, colors=colors, startangle=90)
+        shares = counts / counts.sum()
+        ax1.legend(wedges, [f"{loc} ({share:.1%})" for loc, share in zip(locations, shares)],
+                  loc='center left', bbox_to_anchor=(1, 0.5), fontsize=9)
         ax1.set_title('Job Distribution by Location', fontsize=14, fontweight='bold')
         
         # Bar chart
-        ax2.bar(range(len(top_locations)), list(top_locations.values()), color=colors)
+        bars = ax2.bar(range(len(locations)), counts, color=colors)
         ax2.set_xlabel('Location', fontsize=12, fontweight='bold')
         ax2.set_ylabel('Number of Jobs', fontsize=12, fontweight='bold')
         ax2.set_title('Top 10 Cities for Data Analyst Jobs', fontsize=14, fontweight='bold')
-        ax2.set_xticks(range(len(top_locations)))
-        ax2.set_xticklabels(list(top_locations.keys()), rotation=45, ha='right')
+        ax2.set_xticks(range(len(locations)))
+        ax2.set_xticklabels(locations, rotation=45, ha='right')
         
         # Add value labels on bars
-        for i, v in enumerate(top_locations.values()):
-            ax2.text(i, v + max(top_locations.values()) * 0.01, str(v), 
-                    ha='center', va='bottom', fontweight='bold')
-        
-        plt.tight_layout()
+        ax2.bar_label(bars, padding=3, fontweight='bold')
         
         if save_plot:
-            filename = os.path.join(self.output_dir, 'geographic_distribution.png')
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
+            filename = self._save_figure(fig, 'geographic_distribution')
             self.logger.info(f"Geographic distribution plot saved to {filename}")
         
         return fig
@@ -107,32 +165,31 @@ class JobMarketVisualizer:
             return None
         
         exp_data = self.analysis_results['experience_trends']['distribution']
+        levels = list(exp_data)
+        counts = np.array(list(exp_data.values()))
         
         # Create figure with subplots
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6), constrained_layout=True)
         
         # Pie chart
         colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
-        wedges, texts, autotexts = ax1.pie(exp_data.values(), labels=exp_data.keys(), 
-                                          autopct='%1.1f%%', colors=colors, startangle=90)
+        wedges, _ = ax1.pie(counts, colors=colors, startangle=90)
+        shares = counts / counts.sum()
+        ax1.legend(wedges, [f"{level} ({share:.1%})" for level, share in zip(levels, shares)],
+                  loc='center left', bbox_to_anchor=(1, 0.5), fontsize=9)
         ax1.set_title('Experience Level Distribution', fontsize=14, fontweight='bold')
         
         # Bar chart
-        ax2.bar(exp_data.keys(), exp_data.values(), color=colors)
+        bars = ax2.bar(levels, counts, color=colors)
         ax2.set_xlabel('Experience Level', fontsize=12, fontweight='bold')
         ax2.set_ylabel('Number of Jobs', fontsize=12, fontweight='bold')
         ax2.set_title('Jobs by Experience Level', fontsize=14, fontweight='bold')
         
         # Add value labels on bars
-        for i, (level, count) in enumerate(exp_data.items()):
-            ax2.text(i, count + max(exp_data.values()) * 0.01, str(count), 
-                    ha='center', va='bottom', fontweight='bold')
-        
-        plt.tight_layout()
+        ax2.bar_label(bars, padding=3, fontweight='bold')
         
         if save_plot:
-            filename = os.path.join(self.output_dir, 'experience_distribution.png')
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
+            filename = self._save_figure(fig, 'experience_distribution')
             self.logger.info(f"Experience distribution plot saved to {filename}")
         
         return fig
@@ -143,14 +200,11 @@ class JobMarketVisualizer:
             self.logger.error("Company trends analysis not found")
             return None
         
-        company_data = self.analysis_results['company_trends']['top_hiring_companies']
-        
         # Prepare data
-        companies = list(company_data.keys())[:top_n]
-        counts = list(company_data.values())[:top_n]
+        companies, counts = self._top_items('company_trends', 'top_hiring_companies', top_n)
         
         # Create plot
-        fig, ax = plt.subplots(figsize=(12, 8))
+        fig, ax = plt.subplots(figsize=(12, 8), constrained_layout=True)
         bars = ax.barh(companies[::-1], counts[::-1], 
                       color=plt.cm.plasma(np.linspace(0, 1, len(companies))))
         
@@ -160,15 +214,10 @@ class JobMarketVisualizer:
         ax.set_title(f'Top {top_n} Companies Hiring Data Analysts', fontsize=14, fontweight='bold', pad=20)
         
         # Add value labels on bars
-        for bar, count in zip(bars, counts[::-1]):
-            ax.text(bar.get_width() + 0.1, bar.get_y() + bar.get_height()/2, 
-                   str(count), va='center', ha='left', fontweight='bold')
-        
-        plt.tight_layout()
+        ax.bar_label(bars, padding=3, fontweight='bold')
         
         if save_plot:
-            filename = os.path.join(self.output_dir, 'top_companies.png')
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
+            filename = self._save_figure(fig, 'top_companies')
             self.logger.info(f"Top companies plot saved to {filename}")
         
         return fig
@@ -179,25 +228,25 @@ class JobMarketVisualizer:
             self.logger.error("Skills demand analysis not found")
             return None
         
-        skills_data = self.analysis_results['skills_demand']['top_skills']
+        from wordcloud import WordCloud
         
-        # Create WordCloud
-        wordcloud = WordCloud(width=1200, height=600, 
+        # Only the words that can be drawn are passed in
+        skills, counts = self._top_items('skills_demand', 'top_skills', 100)
+        wordcloud = WordCloud(width=1000, height=500, 
                              background_color='white',
                              colormap='viridis',
                              max_words=100,
                              relative_scaling=0.5,
-                             random_state=42).generate_from_frequencies(skills_data)
+                             random_state=42).generate_from_frequencies(dict(zip(skills, counts)))
         
         # Create plot
-        fig, ax = plt.subplots(figsize=(15, 8))
+        fig, ax = plt.subplots(figsize=(15, 8), constrained_layout=True)
         ax.imshow(wordcloud, interpolation='bilinear')
         ax.axis('off')
         ax.set_title('Data Analyst Skills Word Cloud', fontsize=16, fontweight='bold', pad=20)
         
         if save_plot:
-            filename = os.path.join(self.output_dir, 'skills_wordcloud.png')
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
+            filename = self._save_figure(fig, 'skills_wordcloud')
             self.logger.info(f"Skills word cloud saved to {filename}")
         
         return fig
@@ -215,15 +264,16 @@ class JobMarketVisualizer:
             return None
         
         # Create subplots
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+        fig, axes = plt.subplots(2, 2, figsize=(15, 10), constrained_layout=True)
         fig.suptitle('Salary Analysis for Data Analysts', fontsize=16, fontweight='bold')
         
         # Average salary by experience level
         if 'salary_by_experience' in salary_data:
-            exp_salary = salary_data['salary_by_experience']
-            experience_levels = list(exp_salary.keys())
-            min_salaries = [exp_salary[exp]['salary_min']['mean'] for exp in experience_levels]
-            max_salaries = [exp_salary[exp]['salary_max']['mean'] for exp in experience_levels]
+            experience_levels, exp_arr = self._to_soa(
+                salary_data['salary_by_experience'], [('salary_min', 'mean'), ('salary_max', 'mean')]
+            )
+            min_salaries = exp_arr[('salary_min', 'mean')]
+            max_salaries = exp_arr[('salary_max', 'mean')]
             
             x = np.arange(len(experience_levels))
             width = 0.35
@@ -239,11 +289,13 @@ class JobMarketVisualizer:
         
         # Salary by location (top 5)
         if 'salary_by_location' in salary_data:
-            loc_salary = dict(sorted(salary_data['salary_by_location'].items(), 
-                                   key=lambda x: x[1]['salary_max'], reverse=True)[:5])
-            locations = list(loc_salary.keys())
-            avg_salaries = [(loc_salary[loc]['salary_min'] + loc_salary[loc]['salary_max'])/2 
-                           for loc in locations]
+            all_locations, loc_arr = self._to_soa(
+                salary_data['salary_by_location'], ['salary_min', 'salary_max']
+            )
+            # Keep the 5 locations with the highest max salary
+            top = np.argsort(-loc_arr['salary_max'], kind='stable')[:5]
+            locations = [all_locations[i] for i in top]
+            avg_salaries = (loc_arr['salary_min'][top] + loc_arr['salary_max'][top]) * 0.5
             
             axes[0, 1].bar(locations, avg_salaries, color='skyblue', alpha=0.7)
             axes[0, 1].set_xlabel('Location')
@@ -267,17 +319,16 @@ class JobMarketVisualizer:
         
         # Salary disclosure rate
         disclosure_rate = salary_data.get('salary_disclosure_rate', 0)
+        # The two shares are already percentages, so label with them directly rather
+        # than through autopct's per-wedge callback and extra text artists
         axes[1, 1].pie([disclosure_rate, 100 - disclosure_rate], 
-                      labels=['Disclosed', 'Not Disclosed'], 
-                      autopct='%1.1f%%',
+                      labels=[f'Disclosed ({disclosure_rate:.1f}%)',
+                              f'Not Disclosed ({100 - disclosure_rate:.1f}%)'], 
                       colors=['lightgreen', 'lightcoral'])
         axes[1, 1].set_title('Salary Disclosure Rate')
         
-        plt.tight_layout()
-        
         if save_plot:
-            filename = os.path.join(self.output_dir, 'salary_analysis.png')
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
+            filename = self._save_figure(fig, 'salary_analysis')
             self.logger.info(f"Salary analysis plot saved to {filename}")
         
         return fig
@@ -288,35 +339,41 @@ class JobMarketVisualizer:
             self.logger.error("No analysis results available for dashboard")
             return None
         
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        
         # Create subplots
         fig = make_subplots(
             rows=3, cols=2,
             subplot_titles=('Top Skills', 'Geographic Distribution', 
                            'Experience Levels', 'Top Companies',
                            'Skills by Experience', 'Salary by Location'),
-            specs=[[{"type": "bar"}, {"type": "pie"}],
-                   [{"type": "pie"}, {"type": "bar"}],
+            specs=[[{"type": "bar"}, {"type": "bar"}],
+                   [{"type": "bar"}, {"type": "bar"}],
                    [{"type": "bar"}, {"type": "bar"}]]
         )
         
+        # Traces get numpy arrays, which plotly validates and serializes without
+        # walking the values one by one
+        
         # Top Skills
         if 'skills_demand' in self.analysis_results:
-            skills_data = self.analysis_results['skills_demand']['top_skills']
-            top_skills = dict(sorted(skills_data.items(), key=lambda x: x[1], reverse=True)[:10])
+            skills, counts = map(np.array, self._top_items('skills_demand', 'top_skills', 10))
             
             fig.add_trace(
-                go.Bar(x=list(top_skills.values()), y=list(top_skills.keys()), 
+                go.Bar(x=counts, y=skills, 
                       orientation='h', name='Skills'),
                 row=1, col=1
             )
         
         # Geographic Distribution
         if 'geographic_distribution' in self.analysis_results:
-            location_data = self.analysis_results['geographic_distribution']['jobs_by_location']
-            top_locations = dict(sorted(location_data.items(), key=lambda x: x[1], reverse=True)[:8])
+            locations, counts = map(np.array, self._top_items('geographic_distribution', 'jobs_by_location', 8))
             
+            # Bars labelled with each location's share, as the pie used to show
             fig.add_trace(
-                go.Pie(labels=list(top_locations.keys()), values=list(top_locations.values()),
+                go.Bar(x=locations, y=counts,
+                      text=[f"{share:.1%}" for share in counts / counts.sum()],
                       name="Locations"),
                 row=1, col=2
             )
@@ -324,20 +381,22 @@ class JobMarketVisualizer:
         # Experience Levels
         if 'experience_trends' in self.analysis_results:
             exp_data = self.analysis_results['experience_trends']['distribution']
+            levels = np.array(list(exp_data))
+            counts = np.array(list(exp_data.values()))
             
             fig.add_trace(
-                go.Pie(labels=list(exp_data.keys()), values=list(exp_data.values()),
+                go.Bar(x=levels, y=counts,
+                      text=[f"{share:.1%}" for share in counts / counts.sum()],
                       name="Experience"),
                 row=2, col=1
             )
         
         # Top Companies
         if 'company_trends' in self.analysis_results:
-            company_data = self.analysis_results['company_trends']['top_hiring_companies']
-            top_companies = dict(sorted(company_data.items(), key=lambda x: x[1], reverse=True)[:10])
+            companies, counts = map(np.array, self._top_items('company_trends', 'top_hiring_companies', 10))
             
             fig.add_trace(
-                go.Bar(x=list(top_companies.values()), y=list(top_companies.keys()),
+                go.Bar(x=counts, y=companies,
                       orientation='h', name='Companies'),
                 row=2, col=2
             )
@@ -352,8 +411,9 @@ class JobMarketVisualizer:
         )
         
         # Save as HTML
-        filename = os.path.join(self.output_dir, 'interactive_dashboard.html')
-        fig.write_html(filename)
+        filename = self._dashboard_path
+        # Load plotly.js from the CDN instead of embedding ~3.5 MB of it in the page
+        fig.write_html(filename, include_plotlyjs='cdn')
         self.logger.info(f"Interactive dashboard saved to {filename}")
         
         return fig
@@ -365,13 +425,26 @@ class JobMarketVisualizer:
         visualizations = {}
         
         try:
-            visualizations['skills'] = self.plot_top_skills()
-            visualizations['geographic'] = self.plot_geographic_distribution()
-            visualizations['experience'] = self.plot_experience_distribution()
-            visualizations['companies'] = self.plot_top_companies()
-            visualizations['wordcloud'] = self.create_skills_wordcloud()
-            visualizations['salary'] = self.plot_salary_analysis()
-            visualizations['dashboard'] = self.create_interactive_dashboard()
+            # Select the top entries once here; the workers get copies of the selections
+            # and the dashboard reuses them, instead of every process selecting again
+            for section, key, n in TOP_ITEM_SELECTIONS:
+                if section in self.analysis_results:
+                    self._top_items(section, key, n)
+            
+            # The static plots are independent and CPU-bound, so render them in parallel
+            workers = min(len(STATIC_PLOTS), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    key: executor.submit(_render_plot, self.analysis_results, self._top_items_cache,
+                                         method, name)
+                    for key, (method, name) in STATIC_PLOTS.items()
+                }
+                # Build the dashboard here while the workers render
+                dashboard = self.create_interactive_dashboard()
+                for key, future in futures.items():
+                    visualizations[key] = future.result()
+            
+            visualizations['dashboard'] = dashboard
             
             plt.close('all')  # Close all matplotlib figures
             self.logger.info("All visualizations generated successfully")
@@ -380,3 +453,15 @@ class JobMarketVisualizer:
             self.logger.error(f"Error generating visualizations: {str(e)}")
         
         return visualizations
+
+
+def _render_plot(analysis_results, top_items_cache, method, name):
+    """Render one static plot in a worker process and return the saved file's path"""
+    visualizer = JobMarketVisualizer(analysis_results)
+    visualizer._top_items_cache.update(top_items_cache)
+    fig = getattr(visualizer, method)()
+    if fig is None:
+        return None
+    
+    plt.close(fig)
+    return visualizer._paths[name]